@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CatalogApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "catalog_api"
+
+    def ready(self):
+        from . import signals  # noqa: F401  Registers cache invalidation handlers
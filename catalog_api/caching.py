@@ -0,0 +1,83 @@
+# catalog_api/caching.py
+
+import hashlib
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+CATEGORY_CACHE_NAMESPACE = "categories"
+CATEGORY_CACHE_TIMEOUT = 60 * 15  # Categories are read-mostly reference data
+
+PRODUCT_LIST_CACHE_NAMESPACE = "products"
+PRODUCT_LIST_CACHE_TIMEOUT = 60
+
+API_KEY_CACHE_NAMESPACE = "api_keys"
+# Upper bound on how long a key revoked without a post_save signal (e.g. via
+# queryset.update()) keeps working
+API_KEY_CACHE_TIMEOUT = 60
+
+
+def is_shared_cache():
+    """
+    Return True if the default cache is shared by all worker processes
+    (e.g. Redis), so an invalidation in one process is seen by the others.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def get_cache_version(namespace):
+    """
+    Return the current version number for a cache namespace.
+    """
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # The version key never expires, otherwise it could fall back to an
+        # old number and serve entries written before an invalidation.
+        cache.add(_version_key(namespace), 1, timeout=None)
+        version = cache.get(_version_key(namespace), 1)
+    return version
+
+
+def invalidate_cache(namespace):
+    """
+    Invalidate every cached response in a namespace by bumping its version.
+    This works on any cache backend, unlike deleting keys by pattern.
+    """
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:  # Version key not set yet
+        cache.set(_version_key(namespace), 1, timeout=None)
+
+
+def cached_response(namespace, timeout, handler, request, *args, **kwargs):
+    """
+    Serve handler's response data from the cache, keyed on the full request
+    path (including the query string). Only successful responses are cached.
+    """
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    key = f"{namespace}:v{get_cache_version(namespace)}:{path_hash}"
+
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    response = handler(request, *args, **kwargs)
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, timeout)
+    return response
+
+
+def cache_public(response, max_age):
+    """
+    Mark a response as cacheable by browsers and shared caches (CDNs).
+    """
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
@@ -1,4 +1,6 @@
 import django_filters
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter
 from .models import (
     Product,
     Category,
@@ -40,15 +42,79 @@ class ProductFilter(django_filters.FilterSet):
             "is_featured",
         ]
 
+    def get_form_class(self):
+        """
+        Return the form class, built once per FilterSet class instead of on
+        every request. The schema is fixed, and form instances deep-copy their
+        fields, so the class can be shared between requests. The cache is
+        looked up on the exact class, so subclasses build their own form.
+        """
+        cls = type(self)
+        if "_form_class" not in cls.__dict__:
+            cls._form_class = super().get_form_class()
+        return cls._form_class
+
     def filter_available(self, queryset, name, value):
         """
         Custom filter method for 'available' field.
         If value is True, return products with stock_quantity > 0.
         If value is False, return products with stock_quantity = 0.
+        Uses the database-generated is_available column so the lookup is
+        index-backed.
         """
-        if value:
-            return queryset.filter(stock_quantity__gt=0)  # __gt means "greater than"
-        else:
-            return queryset.filter(
-                stock_quantity=0
-            )  # For products that are NOT available (out of stock)
+        return queryset.filter(is_available=value)
+
+
+ProductFilter().get_form_class()  # Build the form class at import time
+
+
+class ProductFilterBackend(DjangoFilterBackend):
+    """
+    DjangoFilterBackend that skips building the filterset when the request
+    has none of the filterset's query params. This covers plain listings,
+    ordering/cursor-only requests, and detail lookups.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filterset_class = getattr(view, "filterset_class", None)
+        if filterset_class is not None and request.query_params.keys().isdisjoint(
+            filterset_class.base_filters
+        ):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
+
+
+class ProductOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that resolves the view's ordering_fields into a frozenset
+    once per view class, and leaves the queryset alone when no 'ordering'
+    param is given. List responses are still sorted by the view's default
+    ordering, which the cursor paginator applies itself.
+    """
+
+    _valid_field_names = {}  # View class -> frozenset of orderable fields
+
+    def get_valid_field_names(self, queryset, view, request):
+        ordering_fields = getattr(view, "ordering_fields", None)
+        if ordering_fields is None or ordering_fields == "__all__":
+            # Derived from the serializer/model at runtime, so don't cache
+            return frozenset(
+                item[0]
+                for item in self.get_valid_fields(queryset, view, {"request": request})
+            )
+
+        view_class = type(view)
+        if view_class not in self._valid_field_names:
+            self._valid_field_names[view_class] = frozenset(
+                item if isinstance(item, str) else item[0] for item in ordering_fields
+            )
+        return self._valid_field_names[view_class]
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid_fields = self.get_valid_field_names(queryset, view, request)
+        return [term for term in fields if term.removeprefix("-") in valid_fields]
+
+    def filter_queryset(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def create_name_trgm_index(apps, schema_editor):
+    # Trigram GIN indexes are PostgreSQL-only; other backends fall back to
+    # the unique btree index that already backs Product.name.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS product_name_trgm "
+        "ON catalog_api_product USING gin (name gin_trgm_ops)"
+    )
+
+
+def drop_name_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS product_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog_api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_name_trgm_index, drop_name_trgm_index),
+    ]
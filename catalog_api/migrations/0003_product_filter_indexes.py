@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-14 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog_api", "0002_product_name_trgm_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "price"], name="prod_category_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_featured", True)),
+                fields=["is_featured"],
+                name="prod_featured_partial",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["stock_quantity"], name="prod_stock_qty_idx"),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-14 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog_api", "0003_product_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="is_available",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Q(("stock_quantity__gt", 0)),
+                output_field=models.BooleanField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["is_available"],
+                name="prod_instock_partial",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-14 17:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog_api", "0004_product_is_available"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="product",
+            options={},
+        ),
+    ]
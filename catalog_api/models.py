@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connections, models, router
+from django.utils import timezone
 
 
 class Category(models.Model):
@@ -26,6 +27,12 @@ class Product(models.Model):
     stock_quantity = models.PositiveIntegerField(default=0)
     image_url = models.URLField(max_length=200, blank=True, null=True)
     is_featured = models.BooleanField(default=False)
+    # Computed by the database so the 'available' filter can use an index
+    is_available = models.GeneratedField(
+        expression=models.Q(stock_quantity__gt=0),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
 
     # ForeignKey to link a product to a Category
     category = models.ForeignKey(
@@ -42,5 +49,86 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def decrement_stock(cls, pk, quantity):
+        """
+        Atomically take 'quantity' units out of stock for the product 'pk'.
+
+        Runs a single UPDATE ... WHERE stock_quantity >= quantity RETURNING ...,
+        so the stock check, the decrement and fetching the updated row are one
+        round-trip. Returns the updated product, or None if the product doesn't
+        exist or doesn't have enough stock. Like QuerySet.update(), this doesn't
+        send pre_save/post_save signals.
+        """
+        pk = cls._meta.pk.to_python(pk)
+        updated_at = timezone.now()
+        connection = connections[router.db_for_write(cls)]
+
+        # UPDATE ... RETURNING is supported by PostgreSQL and SQLite 3.35+.
+        # Other backends fall back to an ORM update followed by a SELECT.
+        supports_returning = (
+            connection.vendor in ("postgresql", "sqlite")
+            and connection.features.can_return_columns_from_insert
+        )
+        if not supports_returning:
+            updated = cls.objects.filter(pk=pk, stock_quantity__gte=quantity).update(
+                stock_quantity=models.F("stock_quantity") - quantity,
+                updated_at=updated_at,
+            )
+            return cls.objects.get(pk=pk) if updated else None
+
+        fields = cls._meta.concrete_fields
+        qn = connection.ops.quote_name
+        sql = (
+            f"UPDATE {qn(cls._meta.db_table)} "
+            f"SET {qn('stock_quantity')} = {qn('stock_quantity')} - %s, "
+            f"{qn('updated_at')} = %s "
+            f"WHERE {qn(cls._meta.pk.column)} = %s AND {qn('stock_quantity')} >= %s "
+            f"RETURNING {', '.join(qn(field.column) for field in fields)}"
+        )
+        params = [
+            quantity,
+            cls._meta.get_field("updated_at").get_db_prep_value(updated_at, connection),
+            pk,
+            quantity,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+
+        # Apply the same backend converters the ORM would (dates, decimals, ...)
+        values = []
+        for field, value in zip(fields, row):
+            col = field.get_col(cls._meta.db_table)
+            converters = connection.ops.get_db_converters(col)
+            converters += field.get_db_converters(connection)
+            for converter in converters:
+                value = converter(value, col, connection)
+            values.append(value)
+        return cls.from_db(
+            connection.alias, [field.attname for field in fields], values
+        )
+
     class Meta:
-        ordering = ["name"]
+        # No default ordering: list endpoints sort explicitly, so PK lookups
+        # (detail, purchase) don't pay for an ORDER BY.
+        indexes = [
+            # Category filter combined with price range / price ordering
+            models.Index(fields=["category", "price"], name="prod_category_price_idx"),
+            # Only featured rows are indexed, since that's the selective filter
+            models.Index(
+                fields=["is_featured"],
+                condition=models.Q(is_featured=True),
+                name="prod_featured_partial",
+            ),
+            # Backs ordering by stock_quantity
+            models.Index(fields=["stock_quantity"], name="prod_stock_qty_idx"),
+            # Only in-stock rows are indexed, the common 'available=true' case
+            models.Index(
+                fields=["is_available"],
+                condition=models.Q(is_available=True),
+                name="prod_instock_partial",
+            ),
+        ]
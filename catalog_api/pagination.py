@@ -0,0 +1,19 @@
+# catalog_api/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Cursor-based pagination for the product list.
+
+    Pages are fetched with an indexed range scan (WHERE name > :cursor LIMIT n),
+    so there is no COUNT(*) and no OFFSET that grows with the page number.
+    When an 'ordering' query param is given, OrderingFilter's ordering is used
+    for the cursor instead.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "name"  # Unique and indexed, so it's a stable cursor key
@@ -1,12 +1,36 @@
 # catalog_api/permissions.py
 
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import permissions
+from rest_framework_api_key.models import APIKey
 from rest_framework_api_key.permissions import HasAPIKey
 
+from .caching import (
+    API_KEY_CACHE_NAMESPACE,
+    API_KEY_CACHE_TIMEOUT,
+    get_cache_version,
+    is_shared_cache,
+)
+
+# Stateless, so a single instance is shared by all requests
+has_api_key = HasAPIKey()
+
+
 class HasAPIKeyForWriteOperations(permissions.BasePermission):
     """
     Custom permission to only allow write operations if a valid API Key is present.
     Read operations (GET, HEAD, OPTIONS) are allowed without an API Key.
+
+    When a shared cache (Redis) is configured, keys that pass validation are
+    remembered for API_KEY_CACHE_TIMEOUT seconds, so bursts of writes don't
+    each hit the APIKey table and re-hash the key. Saving or deleting an APIKey
+    (e.g. revoking it in the admin) invalidates this for every worker right
+    away; revoking with queryset.update() sends no signal, so such a key keeps
+    working for up to API_KEY_CACHE_TIMEOUT. With a per-process cache the
+    lookup is never cached, since other workers wouldn't see the invalidation.
     """
     def has_permission(self, request, view):
         # Allow read-only methods (GET, HEAD, OPTIONS) for any request
@@ -14,4 +38,47 @@ class HasAPIKeyForWriteOperations(permissions.BasePermission):
             return True
 
         # For write methods (POST, PUT, PATCH, DELETE), require a valid API Key
-        return HasAPIKey().has_permission(request, view)
\ No newline at end of file
+        return self.has_valid_api_key(request)
+
+    def has_valid_api_key(self, request):
+        key = has_api_key.get_key(request)
+        if not key:
+            return False
+
+        use_cache = is_shared_cache()
+        if use_cache:
+            # Only a digest of the key is stored, never the key itself
+            digest = hashlib.sha256(key.encode()).hexdigest()
+            cache_key = (
+                f"{API_KEY_CACHE_NAMESPACE}:"
+                f"v{get_cache_version(API_KEY_CACHE_NAMESPACE)}:{digest}"
+            )
+            if cache.get(cache_key):
+                return True
+
+        try:
+            api_key = APIKey.objects.get_from_key(key)  # Checks revoked + hash
+        except APIKey.DoesNotExist:
+            return False
+        if api_key.has_expired:
+            return False
+        if not use_cache:
+            return True
+
+        # Never cache a key past its own expiry date
+        timeout = API_KEY_CACHE_TIMEOUT
+        if api_key.expiry_date is not None:
+            remaining = (api_key.expiry_date - timezone.now()).total_seconds()
+            timeout = min(timeout, int(remaining))
+        if timeout > 0:
+            cache.set(cache_key, True, timeout)
+        return True
+
+
+class HasAPIKeyForAllOperations(HasAPIKeyForWriteOperations):
+    """
+    Custom permission requiring a valid API Key for every request, reads
+    included. Used for expensive endpoints such as the product export.
+    """
+    def has_permission(self, request, view):
+        return self.has_valid_api_key(request)
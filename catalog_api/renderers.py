@@ -0,0 +1,43 @@
+# catalog_api/renderers.py
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF's encoder handles the types orjson doesn't (Decimal, lazy strings, ...)
+_fallback_encoder = JSONEncoder()
+
+
+def dumps(data, option=0):
+    """
+    Serialize `data` to JSON bytes with orjson.
+    """
+    return orjson.dumps(data, default=_fallback_encoder.default, option=option)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson, which serializes large product lists
+    several times faster than the stdlib json module.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_NON_STR_KEYS
+        # orjson only supports 2-space indentation; any indent pretty-prints
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            option |= orjson.OPT_INDENT_2
+
+        ret = dumps(data, option=option)
+
+        # Escape U+2028/U+2029 like JSONRenderer, keeping the output a strict
+        # javascript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
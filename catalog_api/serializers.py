@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework.serializers import raise_errors_on_nested_writes
 from .models import Category, Product
 
 
@@ -9,6 +10,29 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        """
+        Save only the fields that actually changed, so a PATCH of one field
+        doesn't rewrite every column of the row. Foreign keys are compared by
+        id, so the old related row is never loaded.
+        """
+        raise_errors_on_nested_writes("update", self, validated_data)
+        changed = [
+            field
+            for field, value in validated_data.items()
+            if instance.serializable_value(field) != getattr(value, "pk", value)
+        ]
+        if not changed:
+            return instance
+
+        for field in changed:
+            setattr(instance, field, validated_data[field])
+        instance.save(update_fields=changed + ["updated_at"])
+        if "stock_quantity" in changed:
+            # Generated columns aren't reloaded after an UPDATE
+            instance.refresh_from_db(fields=["is_available"])
+        return instance
+
     class Meta:
         model = Product
         fields = "__all__"
@@ -22,7 +46,50 @@ class ProductSerializer(serializers.ModelSerializer):
             "is_featured": {
                 "help_text": "Indicates if the product should be highlighted."
             },
+            "is_available": {
+                "help_text": "Whether the product currently has stock (computed)."
+            },
             "category": {
                 "help_text": "The ID of the category this product belongs to."
             },
         }
+
+
+class ProductListSerializer(ProductSerializer):
+    """
+    Slimmer representation used by the product list endpoint.
+    Leaves out the (potentially large) description text.
+    """
+
+    class Meta(ProductSerializer.Meta):
+        fields = [
+            "id",
+            "name",
+            "price",
+            "stock_quantity",
+            "image_url",
+            "is_featured",
+            "is_available",
+            "category",
+            "created_at",
+            "updated_at",
+        ]
+
+    # Fields whose raw database values need formatting for the API
+    # (decimal and datetime strings); the rest are passed through as-is
+    formatted_value_fields = ["price", "created_at", "updated_at"]
+
+    @classmethod
+    def represent_values(cls, rows):
+        """
+        Turn rows from queryset.values(*Meta.fields) into the same output as
+        serializing the product instances, formatting only the fields that
+        need it. Rows are yielded lazily, so 'rows' may be a queryset iterator.
+        """
+        fields = cls().fields
+        formatters = [(name, fields[name]) for name in cls.formatted_value_fields]
+        for row in rows:
+            for name, field in formatters:
+                if row[name] is not None:
+                    row[name] = field.to_representation(row[name])
+            yield row
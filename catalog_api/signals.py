@@ -0,0 +1,31 @@
+# catalog_api/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_api_key.models import APIKey
+
+from .caching import (
+    API_KEY_CACHE_NAMESPACE,
+    CATEGORY_CACHE_NAMESPACE,
+    PRODUCT_LIST_CACHE_NAMESPACE,
+    invalidate_cache,
+)
+from .models import Category, Product
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    invalidate_cache(CATEGORY_CACHE_NAMESPACE)
+    # Deleting a category nulls out its products' category field
+    invalidate_cache(PRODUCT_LIST_CACHE_NAMESPACE)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_list_cache(sender, **kwargs):
+    invalidate_cache(PRODUCT_LIST_CACHE_NAMESPACE)
+
+
+@receiver([post_save, post_delete], sender=APIKey)
+def invalidate_api_key_cache(sender, **kwargs):
+    # Revoked or deleted keys must stop working right away
+    invalidate_cache(API_KEY_CACHE_NAMESPACE)
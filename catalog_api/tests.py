@@ -1,10 +1,20 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework_api_key.models import APIKey
+import django_filters
+from .filters import ProductFilter
 from .models import Category, Product
+from .serializers import ProductListSerializer
+from .views import ProductViewSet
+from .throttling import APIKeyScopedRateThrottle
 from decimal import Decimal  # Import the Decimal type
+import json
+from unittest import mock
 
 
 class CategoryModelTest(TestCase):
@@ -33,11 +43,12 @@ class ProductModelTest(TestCase):
     Test suite for the Product model.
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """
         Set up a common category for all tests in this class.
         """
-        self.category = Category.objects.create(name="Books")
+        cls.category = Category.objects.create(name="Books")
 
     def test_create_product(self):
         """
@@ -66,92 +77,208 @@ class ProductModelTest(TestCase):
         self.assertEqual(str(product), "1984")
 
 
+class CategoryAPITest(TestCase):
+    """
+    Test suite for the Category API endpoints.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Books")
+
+    def test_list_categories_is_cacheable(self):
+        """
+        Ensure category lists are marked cacheable for browsers and CDNs.
+        """
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=900", response["Cache-Control"])
+
+    def test_category_cache_invalidated_on_save(self):
+        """
+        Ensure cached category responses are refreshed after a change.
+        """
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(len(response.data), 1)
+
+        # Served from cache: no queries needed
+        with self.assertNumQueries(0):
+            self.client.get(reverse("category-list"))
+
+        Category.objects.create(name="Electronics")
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(len(response.data), 2)
+
+
 class ProductAPITest(TestCase):
     """
     Test suite for the Product API endpoints.
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """
-        Set up a test client and some initial data.
+        Set up the initial data once for the whole class. Each test runs in a
+        transaction that is rolled back, so the rows are shared safely.
         """
-        self.api_key_obj, self.api_key_str = APIKey.objects.create_key(name="test_key")
-        self.client = APIClient()
+        cls.api_key_obj, cls.api_key_str = APIKey.objects.create_key(name="test_key")
+
+        cls.category_books, cls.category_electronics = Category.objects.bulk_create(
+            [Category(name="Books"), Category(name="Electronics")]
+        )
 
-        self.category_books = Category.objects.create(name="Books")
-        self.category_electronics = Category.objects.create(name="Electronics")
-
-        # Create products with distinct names and prices for clear sorting
-        self.product_a = Product.objects.create(
-            name="Animal Farm",
-            description="A satirical novella by George Orwell",
-            price=10.00,
-            category=self.category_books,
-            stock_quantity=10,
-            is_featured=True,
-        )
-        self.product_z = Product.objects.create(
-            name="Zealot: The Life and Times of Jesus of Nazareth",
-            price=30.00,
-            category=self.category_books,
-            stock_quantity=10,
-            is_featured=False,
-        )
-        self.product_m = Product.objects.create(
-            name="Macbeth",
-            description=" A play by William Shakespeare",
-            price=20.00,
-            category=self.category_books,
-            stock_quantity=10,
-            is_featured=False,
-        )
-        self.product_low_price = Product.objects.create(
-            name="Charger",
-            price=5.00,
-            category=self.category_electronics,
-            stock_quantity=10,
-            is_featured=False,
-        )
-        self.product_high_price = Product.objects.create(
-            name="Laptop",
-            price=1000.00,
-            category=self.category_electronics,
-            stock_quantity=10,
-            is_featured=True,
-        )
-        self.product_zero_stock = Product.objects.create(
-            name="Broken Item",
-            price=1.00,
-            category=self.category_electronics,
-            stock_quantity=0,
-            is_featured=False,
+        # Create products with distinct names and prices for clear sorting,
+        # in a single multi-row INSERT
+        (
+            cls.product_a,
+            cls.product_z,
+            cls.product_m,
+            cls.product_low_price,
+            cls.product_high_price,
+            cls.product_zero_stock,
+        ) = Product.objects.bulk_create(
+            [
+                Product(
+                    name="Animal Farm",
+                    description="A satirical novella by George Orwell",
+                    price=10.00,
+                    category=cls.category_books,
+                    stock_quantity=10,
+                    is_featured=True,
+                ),
+                Product(
+                    name="Zealot: The Life and Times of Jesus of Nazareth",
+                    price=30.00,
+                    category=cls.category_books,
+                    stock_quantity=10,
+                    is_featured=False,
+                ),
+                Product(
+                    name="Macbeth",
+                    description=" A play by William Shakespeare",
+                    price=20.00,
+                    category=cls.category_books,
+                    stock_quantity=10,
+                    is_featured=False,
+                ),
+                Product(
+                    name="Charger",
+                    price=5.00,
+                    category=cls.category_electronics,
+                    stock_quantity=10,
+                    is_featured=False,
+                ),
+                Product(
+                    name="Laptop",
+                    price=1000.00,
+                    category=cls.category_electronics,
+                    stock_quantity=10,
+                    is_featured=True,
+                ),
+                Product(
+                    name="Broken Item",
+                    price=1.00,
+                    category=cls.category_electronics,
+                    stock_quantity=0,
+                    is_featured=False,
+                ),
+            ]
         )
 
         # Data for creating a new product via API (if needed for other tests)
-        self.valid_payload = {
+        cls.valid_payload = {
             "name": "New Book",
             "description": "A newly added book.",
             "price": 18.00,
-            "category": self.category_books.id,
+            "category": cls.category_books.id,
             "stock_quantity": 75,
             "image_url": "http://example.com/newbook.jpg",
             "is_featured": False,
         }
-        self.invalid_payload = {
+        cls.invalid_payload = {
             "description": "An invalid product.",
-            "category": self.category_books.id,
+            "category": cls.category_books.id,
         }
 
+    list_view = staticmethod(ProductViewSet.as_view({"get": "list"}))
+
+    def setUp(self):
+        """
+        Set up a fresh test client for each test.
+        """
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+        # Cached responses would outlive the rolled-back test transaction
+        cache.clear()
+
         # API Key for testing authenticated requests
         self.auth_headers = {'Authorization': f'API-Key {self.api_key_str}'}
 
+    def get_product_list(self, params=None):
+        """
+        Call the product list view directly, skipping middleware, URL
+        resolution and rendering. Used by the filter and sort tests.
+        """
+        request = self.factory.get(reverse("product-list"), params)
+        return self.list_view(request)
+
     def test_list_all_products(self):
         """
         Ensure the API can retrieve a list of all products.
         """
         response = self.client.get(reverse("product-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 6)
+        self.assertEqual(len(response.data["results"]), 6)
+
+    def test_list_products_renders_json(self):
+        """
+        Ensure the rendered list body is valid JSON matching the response data.
+        """
+        response = self.client.get(reverse("product-list"))
+        self.assertEqual(response["Content-Type"], "application/json")
+        body = response.json()
+        self.assertEqual(len(body["results"]), 6)
+        self.assertEqual(body["results"][0]["name"], self.product_a.name)
+        self.assertEqual(body["results"][0]["price"], "10.00")
+
+    def test_list_products_match_list_serializer(self):
+        """
+        Ensure list rows are identical to ProductListSerializer's output.
+        """
+        response = self.client.get(reverse("product-list"), {"name": "farm"})
+        self.assertEqual(
+            response.data["results"][0],
+            ProductListSerializer(Product.objects.get(pk=self.product_a.pk)).data,
+        )
+
+    def test_list_products_omits_description(self):
+        """
+        Ensure the list endpoint leaves out descriptions, while detail keeps them.
+        """
+        response = self.client.get(reverse("product-list"), {"name": "farm"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("description", response.data["results"][0])
+
+        response = self.client.get(
+            reverse("product-detail", kwargs={"pk": self.product_a.id})
+        )
+        self.assertEqual(response.data["description"], self.product_a.description)
+
+    def test_list_products_is_cursor_paginated(self):
+        """
+        Ensure the product list is paginated with an opaque cursor.
+        """
+        response = self.client.get(reverse("product-list"), {"page_size": 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIsNotNone(response.data["next"])
+        self.assertNotIn("count", response.data)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["next"])
 
     def test_create_product(self):
         """
@@ -213,22 +340,20 @@ class ProductAPITest(TestCase):
         """
         Ensure products can be filtered by name.
         """
-        response = self.client.get(reverse("product-list"), {"name": "farm"})
+        response = self.get_product_list({"name": "farm"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], self.product_a.name)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], self.product_a.name)
 
     def test_filter_products_by_category(self):
         """
         Ensure products can be filtered by category ID.
         """
-        response = self.client.get(
-            reverse("product-list"), {"category": self.category_electronics.id}
-        )
+        response = self.get_product_list({"category": self.category_electronics.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data["results"]), 3)
         # Check if the correct products are returned
-        product_names = [p["name"] for p in response.data]
+        product_names = [p["name"] for p in response.data["results"]]
         self.assertIn(self.product_low_price.name, product_names)
         self.assertIn(self.product_high_price.name, product_names)
         self.assertIn(self.product_zero_stock.name, product_names)
@@ -238,31 +363,31 @@ class ProductAPITest(TestCase):
         Ensure products can be filtered by min_price and max_price.
         """
         # Filter for products between 10.00 and 20.00
-        response = self.client.get(
-            reverse("product-list"), {"min_price": 10.00, "max_price": 20.00}
-        )
+        response = self.get_product_list({"min_price": 10.00, "max_price": 20.00})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        product_names = [p["name"] for p in response.data]
+        self.assertEqual(len(response.data["results"]), 2)
+        product_names = [p["name"] for p in response.data["results"]]
         self.assertIn(self.product_a.name, product_names)
         self.assertIn(self.product_m.name, product_names)
 
         # Filter for products above 100.00
-        response = self.client.get(reverse("product-list"), {"min_price": 100.00})
+        response = self.get_product_list({"min_price": 100.00})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], self.product_high_price.name)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            response.data["results"][0]["name"], self.product_high_price.name
+        )
 
     def test_filter_products_by_availability(self):
         """
         Ensure products can be filtered by availability (in stock).
         """
-        response = self.client.get(reverse("product-list"), {"available": True})
+        response = self.get_product_list({"available": True})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
-            len(response.data), 5
+            len(response.data["results"]), 5
         )  # Apple, Mango, Zebra, Charger, Laptop (Broken Item is 0 stock)
-        product_names = [p["name"] for p in response.data]
+        product_names = [p["name"] for p in response.data["results"]]
         self.assertIn(self.product_a.name, product_names)
         self.assertIn(self.product_z.name, product_names)
         self.assertIn(self.product_m.name, product_names)
@@ -270,14 +395,26 @@ class ProductAPITest(TestCase):
         self.assertIn(self.product_high_price.name, product_names)
         self.assertNotIn(self.product_zero_stock.name, product_names)
 
+    def test_filter_products_by_unavailability(self):
+        """
+        Ensure products can be filtered by availability (out of stock).
+        """
+        response = self.get_product_list({"available": False})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)  # Broken Item
+        self.assertEqual(
+            response.data["results"][0]["name"], self.product_zero_stock.name
+        )
+        self.assertFalse(response.data["results"][0]["is_available"])
+
     def test_filter_products_by_featured_flag(self):
         """
         Ensure products can be filtered by is_featured flag.
         """
-        response = self.client.get(reverse("product-list"), {"is_featured": True})
+        response = self.get_product_list({"is_featured": True})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Apple, Laptop
-        product_names = [p["name"] for p in response.data]
+        self.assertEqual(len(response.data["results"]), 2)  # Apple, Laptop
+        product_names = [p["name"] for p in response.data["results"]]
         self.assertIn(self.product_a.name, product_names)
         self.assertIn(self.product_high_price.name, product_names)
         self.assertNotIn(self.product_z.name, product_names)
@@ -285,17 +422,40 @@ class ProductAPITest(TestCase):
         self.assertNotIn(self.product_low_price.name, product_names)
         self.assertNotIn(self.product_zero_stock.name, product_names)
 
+    def test_filter_products_with_invalid_value(self):
+        """
+        Ensure invalid filter values are still rejected.
+        """
+        response = self.get_product_list({"min_price": "cheap"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_price", response.data)
+
+    def test_product_filter_subclass_builds_own_form(self):
+        """
+        Ensure a ProductFilter subclass doesn't reuse its parent's form class.
+        """
+
+        class ExactNameProductFilter(ProductFilter):
+            exact_name = django_filters.CharFilter(field_name="name")
+
+        filterset = ExactNameProductFilter(
+            {"exact_name": self.product_m.name}, queryset=Product.objects.all()
+        )
+        self.assertIn("exact_name", filterset.form.fields)
+        self.assertEqual(list(filterset.qs), [self.product_m])
+        self.assertNotIn("exact_name", ProductFilter().form.fields)
+
     # --- TESTS FOR SORTING ---
 
     def test_sort_products_by_name_asc(self):
         """
         Ensure products can be sorted by name in ascending order.
         """
-        response = self.client.get(reverse("product-list"), {"ordering": "name"})
+        response = self.get_product_list({"ordering": "name"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Check the order of names
         # expected_order = ["Apple", "Charger", "Laptop", "Mango", "Zebra", "Broken Item"] # Default ordering by name
-        actual_order = [p["name"] for p in response.data]
+        actual_order = [p["name"] for p in response.data["results"]]
         self.assertEqual(
             actual_order, sorted(actual_order)
         )  # Simple check for sorted order
@@ -308,9 +468,9 @@ class ProductAPITest(TestCase):
         """
         Ensure products can be sorted by name in descending order.
         """
-        response = self.client.get(reverse("product-list"), {"ordering": "-name"})
+        response = self.get_product_list({"ordering": "-name"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        actual_order = [p["name"] for p in response.data]
+        actual_order = [p["name"] for p in response.data["results"]]
         self.assertEqual(
             actual_order, sorted(actual_order, reverse=True)
         )  # Simple check for reverse sorted order
@@ -323,10 +483,10 @@ class ProductAPITest(TestCase):
         """
         Ensure products can be sorted by price in ascending order.
         """
-        response = self.client.get(reverse("product-list"), {"ordering": "price"})
+        response = self.get_product_list({"ordering": "price"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         actual_prices = [
-            float(p["price"]) for p in response.data
+            float(p["price"]) for p in response.data["results"]
         ]  # Convert to Decimal for comparison
         self.assertEqual(actual_prices, sorted(actual_prices))
         # More precise check:
@@ -338,15 +498,83 @@ class ProductAPITest(TestCase):
         """
         Ensure products can be sorted by price in descending order.
         """
-        response = self.client.get(reverse("product-list"), {"ordering": "-price"})
+        response = self.get_product_list({"ordering": "-price"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        actual_prices = [float(p["price"]) for p in response.data]
+        actual_prices = [float(p["price"]) for p in response.data["results"]]
         self.assertEqual(actual_prices, sorted(actual_prices, reverse=True))
         # More precise check:
         self.assertEqual(actual_prices[0], self.product_high_price.price)
         self.assertEqual(actual_prices[1], self.product_z.price)
         self.assertEqual(actual_prices[2], self.product_m.price)
 
+    def test_sort_products_by_invalid_field_uses_default(self):
+        """
+        Ensure unknown ordering fields are ignored in favour of the default (name).
+        """
+        response = self.get_product_list({"ordering": "-description,--name"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        actual_order = [p["name"] for p in response.data["results"]]
+        self.assertEqual(actual_order, sorted(actual_order))
+
+    # --- TESTS FOR EXPORT ---
+
+    def test_export_products_streams_all_rows(self):
+        """
+        Ensure the export streams every product as a single JSON array.
+        """
+        response = self.client.get(
+            reverse("product-export"), headers=self.auth_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 6)
+        names = [row["name"] for row in rows]
+        self.assertEqual(names, sorted(names))  # Default ordering by name
+        self.assertEqual(
+            rows[0],
+            ProductListSerializer(Product.objects.get(pk=self.product_a.pk)).data,
+        )
+
+    def test_export_products_applies_filters(self):
+        """
+        Ensure the export honours the same filters and ordering as the list.
+        """
+        response = self.client.get(
+            reverse("product-export"),
+            {"category": self.category_electronics.id, "ordering": "-price"},
+            headers=self.auth_headers,
+        )
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            [row["name"] for row in rows],
+            [
+                self.product_high_price.name,
+                self.product_low_price.name,
+                self.product_zero_stock.name,
+            ],
+        )
+
+    def test_export_products_unauthenticated(self):
+        """
+        Ensure exporting products without API key returns 403 Forbidden.
+        """
+        response = self.client.get(reverse("product-export"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @mock.patch.object(
+        APIKeyScopedRateThrottle, "THROTTLE_RATES", {"export": "1/hour"}
+    )
+    def test_export_products_is_rate_limited(self):
+        """
+        Ensure exports beyond the rate limit are rejected with 429.
+        """
+        url = reverse("product-export")
+        response = self.client.get(url, headers=self.auth_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url, headers=self.auth_headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
     # --- TESTS FOR INVENTORY MANAGEMENT AND FEATURED FLAG UPDATE ---
 
     def test_purchase_product_decreases_stock(self):
@@ -375,6 +603,83 @@ class ProductAPITest(TestCase):
             response.data["stock_quantity"], initial_stock - purchase_quantity
         )
 
+    def test_purchase_returns_full_product(self):
+        """
+        Ensure the purchase response matches the product detail representation.
+        """
+        response = self.client.post(
+            reverse("product-purchase", kwargs={"pk": self.product_a.id}),
+            data={"quantity": 10},  # Buys up all the stock
+            format="json",
+            headers=self.auth_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["stock_quantity"], 0)
+        self.assertFalse(response.data["is_available"])
+
+        detail = self.client.get(
+            reverse("product-detail", kwargs={"pk": self.product_a.id})
+        )
+        self.assertEqual(response.data, detail.data)
+
+    def test_purchase_refreshes_cached_product_list(self):
+        """
+        Ensure a purchase is reflected in a previously cached product list.
+        """
+        params = {"name": "farm"}
+        response = self.client.get(reverse("product-list"), params)
+        self.assertEqual(response.data["results"][0]["stock_quantity"], 10)
+
+        self.client.post(
+            reverse("product-purchase", kwargs={"pk": self.product_a.id}),
+            data={"quantity": 4},
+            format="json",
+            headers=self.auth_headers,
+        )
+        response = self.client.get(reverse("product-list"), params)
+        self.assertEqual(response.data["results"][0]["stock_quantity"], 6)
+
+    @mock.patch.object(
+        APIKeyScopedRateThrottle, "THROTTLE_RATES", {"purchase": "2/min"}
+    )
+    def test_purchase_is_rate_limited(self):
+        """
+        Ensure purchases beyond the rate limit are rejected with 429.
+        """
+        url = reverse("product-purchase", kwargs={"pk": self.product_a.id})
+        for _ in range(2):
+            response = self.client.post(
+                url, data={"quantity": 1}, format="json", headers=self.auth_headers
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(
+            url, data={"quantity": 1}, format="json", headers=self.auth_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.product_a.refresh_from_db()
+        self.assertEqual(self.product_a.stock_quantity, 8)
+
+    def test_purchase_locked_product_returns_conflict(self):
+        """
+        Ensure purchasing a product whose row is locked returns 409 Conflict.
+        """
+        # SQLite has no row locks, so simulate SKIP LOCKED skipping the row
+        with mock.patch.object(
+            connection.features, "has_select_for_update_skip_locked", True
+        ), mock.patch.object(
+            Product.objects, "select_for_update", return_value=Product.objects.none()
+        ):
+            response = self.client.post(
+                reverse("product-purchase", kwargs={"pk": self.product_a.id}),
+                data={"quantity": 1},
+                format="json",
+                headers=self.auth_headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.product_a.refresh_from_db()
+        self.assertEqual(self.product_a.stock_quantity, 10)
+
     def test_purchase_out_of_stock_product_fails(self):
         """
         Ensure purchasing an out-of-stock product returns an error.
@@ -401,6 +706,33 @@ class ProductAPITest(TestCase):
         self.product_zero_stock.refresh_from_db()
         self.assertEqual(self.product_zero_stock.stock_quantity, initial_stock)
 
+    def test_purchase_more_than_stock_fails(self):
+        """
+        Ensure purchasing more units than are in stock leaves stock untouched.
+        """
+        response = self.client.post(
+            reverse("product-purchase", kwargs={"pk": self.product_a.id}),
+            data={"quantity": 11},  # product_a has 10 stock
+            format="json",
+            headers=self.auth_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("only 10 available", response.data["detail"].lower())
+        self.product_a.refresh_from_db()
+        self.assertEqual(self.product_a.stock_quantity, 10)
+
+    def test_purchase_non_existent_product(self):
+        """
+        Ensure purchasing a non-existent product returns 404.
+        """
+        response = self.client.post(
+            reverse("product-purchase", kwargs={"pk": 99999}),
+            data={"quantity": 1},
+            format="json",
+            headers=self.auth_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_update_product_featured_status(self):
         """
         Ensure the is_featured flag can be updated via API.
@@ -422,6 +754,67 @@ class ProductAPITest(TestCase):
         self.product_m.refresh_from_db()
         self.assertEqual(self.product_m.is_featured, True)
 
+    def test_update_stock_refreshes_availability(self):
+        """
+        Ensure updating stock returns the recomputed is_available flag.
+        """
+        response = self.client.patch(
+            reverse("product-detail", kwargs={"pk": self.product_a.id}),
+            data={"stock_quantity": 0},
+            format="json",
+            headers=self.auth_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["stock_quantity"], 0)
+        self.assertFalse(response.data["is_available"])
+
+    def test_partial_update_only_writes_changed_fields(self):
+        """
+        Ensure a PATCH only sends the changed columns in its UPDATE.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                reverse("product-detail", kwargs={"pk": self.product_m.id}),
+                data={"is_featured": True, "price": "20.00"},  # price unchanged
+                format="json",
+                headers=self.auth_headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [
+            q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"is_featured"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"price"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+    def test_partial_update_category_does_not_load_old_category(self):
+        """
+        Ensure changing a product's category doesn't fetch its old category.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                reverse("product-detail", kwargs={"pk": self.product_m.id}),
+                data={"category": self.category_electronics.id},
+                format="json",
+                headers=self.auth_headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["category"], self.category_electronics.id)
+        category_selects = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT")
+            and 'FROM "catalog_api_category"' in q["sql"]
+        ]
+        # Only the serializer's validation of the new category id
+        self.assertEqual(len(category_selects), 1)
+        # API key lookup, product lookup, category validation, UPDATE
+        self.assertEqual(len(ctx.captured_queries), 4, ctx.captured_queries)
+        self.product_m.refresh_from_db()
+        self.assertEqual(self.product_m.category_id, self.category_electronics.id)
+
     # --- NEW TESTS FOR PERMISSIONS ---
 
     def test_create_product_unauthenticated(self):
@@ -463,6 +856,62 @@ class ProductAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertTrue(Product.objects.filter(id=self.product_a.id).exists()) # Product should still exist
 
+    def test_revoked_api_key_is_rejected(self):
+        """
+        Ensure a revoked API key stops working even after it was cached.
+        """
+        response = self.client.patch(
+            reverse("product-detail", kwargs={"pk": self.product_a.id}),
+            data={"is_featured": False},
+            format="json",
+            headers=self.auth_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.api_key_obj.revoked = True
+        self.api_key_obj.save()
+        response = self.client.patch(
+            reverse("product-detail", kwargs={"pk": self.product_a.id}),
+            data={"is_featured": True},
+            format="json",
+            headers=self.auth_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @mock.patch("catalog_api.permissions.is_shared_cache", return_value=True)
+    def test_revoked_api_key_is_rejected_with_shared_cache(self, _):
+        """
+        Ensure revoking a key invalidates its cached validation.
+        """
+        self.test_revoked_api_key_is_rejected()
+
+    def test_api_key_not_cached_with_per_process_cache(self):
+        """
+        Ensure validated keys aren't cached when the cache isn't shared.
+        """
+        with mock.patch("catalog_api.permissions.cache") as key_cache:
+            response = self.client.patch(
+                reverse("product-detail", kwargs={"pk": self.product_a.id}),
+                data={"is_featured": False},
+                format="json",
+                headers=self.auth_headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        key_cache.get.assert_not_called()
+        key_cache.set.assert_not_called()
+
+    def test_invalid_api_key_is_rejected(self):
+        """
+        Ensure a well-formed but unknown API key returns 403 Forbidden.
+        """
+        prefix = self.api_key_str.partition(".")[0]
+        response = self.client.delete(
+            reverse("product-detail", kwargs={"pk": self.product_a.id}),
+            headers={"Authorization": f"API-Key {prefix}.not-the-secret"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Product.objects.filter(id=self.product_a.id).exists())
+
     def test_purchase_product_unauthenticated(self):
         """
         Ensure purchasing a product without API key returns 403 Forbidden.
@@ -0,0 +1,26 @@
+# catalog_api/throttling.py
+
+import hashlib
+
+from rest_framework.throttling import ScopedRateThrottle
+
+from .permissions import has_api_key
+
+
+class APIKeyScopedRateThrottle(ScopedRateThrottle):
+    """
+    Scoped rate throttle keyed on the client's API key (its digest, never the
+    raw key), falling back to the client IP for requests without one.
+
+    Counters live in the default cache, so with Redis configured each check
+    is a cache round-trip rather than a database query.
+    """
+
+    def get_cache_key(self, request, view):
+        key = has_api_key.get_key(request)
+        if key:
+            ident = "key:" + hashlib.sha256(key.encode()).hexdigest()
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
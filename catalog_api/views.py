@@ -1,15 +1,36 @@
 # from django.shortcuts import render
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.http import Http404, StreamingHttpResponse
 from .models import Category, Product
-from .serializers import CategorySerializer, ProductSerializer
+from .serializers import CategorySerializer, ProductSerializer, ProductListSerializer
 from rest_framework import viewsets, status
-from django_filters.rest_framework import (
-    DjangoFilterBackend,
-)  # Import the filter backend
-from rest_framework.filters import OrderingFilter  # Import OrderingFilter
-from .filters import ProductFilter  # Import your custom filterset
+from .filters import (
+    ProductFilter,
+    ProductFilterBackend,
+    ProductOrderingFilter,
+)  # Import your custom filterset and filter backends
 from rest_framework.decorators import action  # Import action decorator
 from rest_framework.response import Response  # Import Response
-from .permissions import HasAPIKeyForWriteOperations # Import your new custom permission
+from .permissions import (
+    HasAPIKeyForAllOperations,
+    HasAPIKeyForWriteOperations,
+)  # Import your custom permissions
+from .pagination import ProductCursorPagination
+from .throttling import APIKeyScopedRateThrottle
+from .renderers import dumps
+from .caching import (
+    CATEGORY_CACHE_NAMESPACE,
+    CATEGORY_CACHE_TIMEOUT,
+    PRODUCT_LIST_CACHE_NAMESPACE,
+    PRODUCT_LIST_CACHE_TIMEOUT,
+    cache_public,
+    cached_response,
+    invalidate_cache,
+)
+
+# Rows fetched per database round-trip when streaming a product export
+EXPORT_CHUNK_SIZE = 2000
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -21,6 +42,30 @@ class CategoryViewSet(viewsets.ModelViewSet):
     # Apply permissions: GET is public, POST/PUT/DELETE require API Key
     permission_classes = [HasAPIKeyForWriteOperations]
 
+    # Categories rarely change, so reads are cached (invalidated on save/delete
+    # in signals.py) and marked cacheable for browsers/CDNs.
+    def list(self, request, *args, **kwargs):
+        response = cached_response(
+            CATEGORY_CACHE_NAMESPACE,
+            CATEGORY_CACHE_TIMEOUT,
+            super().list,
+            request,
+            *args,
+            **kwargs,
+        )
+        return cache_public(response, CATEGORY_CACHE_TIMEOUT)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = cached_response(
+            CATEGORY_CACHE_NAMESPACE,
+            CATEGORY_CACHE_TIMEOUT,
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
+        return cache_public(response, CATEGORY_CACHE_TIMEOUT)
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     """
@@ -31,28 +76,100 @@ class ProductViewSet(viewsets.ModelViewSet):
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [ProductFilterBackend, ProductOrderingFilter]
     filterset_class = ProductFilter
+    pagination_class = ProductCursorPagination
     ordering_fields = [
         "name",
         "price",
         "stock_quantity",
         "created_at",
     ]  # Specify fields for ordering
-    # You can also set a default ordering if no 'ordering' param is provided:
-    # ordering = ['name']
+    # Default ordering when no 'ordering' param is provided (list only)
+    ordering = ["name"]
     # Apply permissions: GET is public, POST/PUT/DELETE require API Key
     permission_classes = [HasAPIKeyForWriteOperations]
+    # Only throttled actions set a scope (see purchase and export)
+    throttle_scope = None
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return ProductListSerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        # Short-lived cache keyed on the query string, so repeated filter/sort
+        # combinations skip the SQL and serialization.
+        return cached_response(
+            PRODUCT_LIST_CACHE_NAMESPACE,
+            PRODUCT_LIST_CACHE_TIMEOUT,
+            self.list_values,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def list_values(self, request, *args, **kwargs):
+        """
+        Build the list page from .values() rows instead of model instances.
+        Produces the same output as ProductListSerializer while only selecting
+        its columns and skipping the per-field serializer loop.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            queryset.values(*ProductListSerializer.Meta.fields)
+        )
+        data = list(ProductListSerializer.represent_values(page))
+        return self.get_paginated_response(data)
+
+    # --- Custom Action for Product Export ---
+    # Scans the whole catalog, so unlike the list it requires an API Key and
+    # is throttled (rate set in settings.DEFAULT_THROTTLE_RATES)
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[HasAPIKeyForAllOperations],
+        throttle_classes=[APIKeyScopedRateThrottle],
+        throttle_scope="export",
+    )
+    def export(self, request):
+        """
+        Custom action to download every product matching the filters as one
+        JSON array, without pagination. Requires an API Key. Rows are fetched
+        and written out in chunks, so memory use doesn't grow with the size of
+        the catalog.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.ordering)
+        rows = ProductListSerializer.represent_values(
+            queryset.values(*ProductListSerializer.Meta.fields).iterator(
+                chunk_size=EXPORT_CHUNK_SIZE
+            )
+        )
+
+        def stream():
+            yield b"["
+            for index, row in enumerate(rows):
+                yield (b"," if index else b"") + dumps(row)
+            yield b"]"
+
+        return StreamingHttpResponse(stream(), content_type="application/json")
 
     # --- Custom Action for Product Purchase ---
-    @action(detail=True, methods=["post"])
+    # Throttled so a flash sale sheds excess load before it reaches the
+    # database row lock (rate set in settings.DEFAULT_THROTTLE_RATES)
+    @action(
+        detail=True,
+        methods=["post"],
+        throttle_classes=[APIKeyScopedRateThrottle],
+        throttle_scope="purchase",
+    )
     def purchase(self, request, pk=None):
         """
         Custom action to simulate purchasing a product, decreasing its stock.
         Requires 'quantity' in the request body.
         """
-        product = self.get_object()  # Get the specific product instance
-
         # Get quantity from request body
         quantity = request.data.get("quantity")
 
@@ -74,8 +191,38 @@ class ProductViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Check for sufficient stock
-        if product.stock_quantity < quantity:
+        try:
+            pk = Product._meta.pk.to_python(pk)
+        except ValidationError:  # Malformed pk
+            raise Http404
+
+        connection = connections[router.db_for_write(Product)]
+        with transaction.atomic(using=connection.alias):
+            # Under heavy contention, fail fast with 409 instead of queueing
+            # behind another purchase's row lock (PostgreSQL/MySQL only)
+            if connection.features.has_select_for_update_skip_locked:
+                locked = (
+                    Product.objects.select_for_update(skip_locked=True)
+                    .filter(pk=pk)
+                    .values_list("pk", flat=True)
+                )
+                if not locked:
+                    if not Product.objects.filter(pk=pk).exists():
+                        raise Http404
+                    return Response(
+                        {"detail": "Product is busy, please retry."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+
+            # Decrease stock in a single conditional UPDATE ... RETURNING, so two
+            # concurrent purchases can't both pass the stock check and oversell
+            # the product, and the updated row comes back without another SELECT.
+            product = Product.decrement_stock(pk, quantity)
+
+        if product is None:
+            # Either the product doesn't exist (get_object raises 404)
+            # or it doesn't have enough stock.
+            product = self.get_object()
             return Response(
                 {
                     "detail": f"Not enough stock. Only {product.stock_quantity} available."
@@ -83,9 +230,8 @@ class ProductViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Decrease stock quantity
-        product.stock_quantity -= quantity
-        product.save()  # Save changes to the database
+        # The raw UPDATE doesn't send post_save, so invalidate explicitly
+        invalidate_cache(PRODUCT_LIST_CACHE_NAMESPACE)
 
         # Return updated product data
         serializer = self.get_serializer(product)
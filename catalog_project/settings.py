@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -87,6 +88,32 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Used for response/API key caching (see catalog_api/caching.py) and for the
+# purchase rate-limit counters. Set REDIS_URL to share them across processes
+# (requires the 'redis' package); otherwise each process keeps its own.
+#
+# Without REDIS_URL, cache invalidation only reaches the worker process that
+# handled the write: other workers keep serving their cached category responses
+# for up to 15 minutes, and product lists for up to 60 seconds. Always set
+# REDIS_URL when running more than one worker.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -129,6 +156,10 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "catalog_api.renderers.ORJSONRenderer",  # Faster drop-in for JSONRenderer
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
@@ -136,7 +167,12 @@ REST_FRAMEWORK = {
     # Default Authentication and Permission classes
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication", # For browsable API
-    ]
+    ],
+    # Rates for views using a throttle_scope (per API key)
+    "DEFAULT_THROTTLE_RATES": {
+        "purchase": "30/min",
+        "export": "10/hour",
+    },
 }
 
 # drf-yasg settings for API documentation